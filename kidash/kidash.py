@@ -22,25 +22,153 @@
 #
 
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import scan, bulk
+from elasticsearch.helpers import parallel_bulk, ScanError
 import json
 import logging
 import argparse
+import itertools
+import os
+import queue
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import ubjson
+except ImportError:
+    ubjson = None
 
 CHUNK_SIZE = 1000
-FILTER = {"query": {"filtered": {"query": {"match_all": {}},"filter": {"not": {"prefix": {"_id": "_"}}}}}}
-CLIENT_FILTER = {"query": {"filtered": {"query": {"prefix": {"_id": "_"}}}}}
+SCROLL = '1m'
+MAX_SLICES = 8
+BULK_CHUNK_SIZE = 5000
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+BULK_QUEUE_SIZE = 4
+BULK_BATCH_SIZE = 500
+BULK_REQUEST_TIMEOUT = 120
+TIMEOUT = 60
+MAX_RETRIES = 3
+# A delete batch may be sent twice, and each request retried on timeout
+DELETE_SCROLL = '%ds' % (2 * (MAX_RETRIES + 1) * BULK_REQUEST_TIMEOUT + 60)
+BULK_INDEX_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": "0"}
+INDENT = b'  '
+FORMATS = {
+            'json': None,
+            'cbor': 'cbor2',
+            'msgpack': 'msgpack',
+            'ubjson': 'py-ubjson'
+          }
+FILTER = {"query": {"bool": {"must": {"match_all": {}}, "must_not": {"prefix": {"_id": "_"}}}}}
+CLIENT_FILTER = {"query": {"prefix": {"_id": "_"}}}
 ALL = {"query": {"match_all": {}}}
+QUERIES = {
+            'filter': FILTER,
+            'client': CLIENT_FILTER,
+            'all': ALL,
+            None: ALL
+          }
 
 logger = logging.getLogger(__name__)
 
 
+def json_loads(data):
+    """Deserialize a JSON document given as bytes.
+
+    Uses orjson when it is available, falling back to the standard
+    library otherwise.
+
+    :param data: bytes of the JSON document
+    :returns: the deserialized object
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def json_dumps(obj, pretty=False):
+    """Serialize an object to JSON.
+
+    Uses orjson when it is available, falling back to the standard
+    library otherwise.
+
+    :param obj: object to serialize
+    :param pretty: indent the output and sort the keys
+    :returns: bytes of the JSON document
+    """
+    if orjson:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS if pretty else 0
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        data = json.dumps(obj, indent=2, sort_keys=True)
+    else:
+        data = json.dumps(obj, separators=(',', ':'))
+    return data.encode('utf-8')
+
+
+def binary_loads(data, file_format):
+    """Deserialize a document given in a binary format.
+
+    :param data: bytes of the document
+    :param file_format: one of 'cbor', 'msgpack' or 'ubjson'
+    :returns: the deserialized object
+    :raises RuntimeError: when the package for the format is not installed
+    """
+    if file_format == 'cbor' and cbor2:
+        return cbor2.loads(data)
+    elif file_format == 'msgpack' and msgpack:
+        return msgpack.unpackb(data, raw=False)
+    elif file_format == 'ubjson' and ubjson:
+        return ubjson.loadb(data)
+    raise RuntimeError("%s is required to read %s files" % (FORMATS[file_format], file_format))
+
+
+def binary_dumps(obj, file_format):
+    """Serialize an object to a binary format.
+
+    :param obj: object to serialize
+    :param file_format: one of 'cbor', 'msgpack' or 'ubjson'
+    :returns: bytes of the document
+    :raises RuntimeError: when the package for the format is not installed
+    """
+    if file_format == 'cbor' and cbor2:
+        return cbor2.dumps(obj)
+    elif file_format == 'msgpack' and msgpack:
+        return msgpack.packb(obj, use_bin_type=True)
+    elif file_format == 'ubjson' and ubjson:
+        return ubjson.dumpb(obj)
+    raise RuntimeError("%s is required to write %s files" % (FORMATS[file_format], file_format))
+
+
 class Kidash:
 
-    def __init__(self, url, index='.kibana', doc_type=None):
-        self.es = Elasticsearch(url, verify_certs=True)
+    def __init__(self, url, index='.kibana', doc_type=None,
+                 chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                 thread_count=None, batch_size=BULK_BATCH_SIZE):
         self.index = index
         self.doc_type = doc_type
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.thread_count = thread_count or os.cpu_count() or 1
+        self.es = Elasticsearch(url, verify_certs=True,
+                                maxsize=self.thread_count + MAX_SLICES,
+                                http_compress=True,
+                                timeout=TIMEOUT,
+                                max_retries=MAX_RETRIES,
+                                retry_on_timeout=True)
+        self.batch_size = batch_size
 
     def search_request(self, body, size, filter_path):
         """Make a search in ES based on the given parameters.
@@ -52,7 +180,7 @@ class Kidash:
         """
         request = self.es.search(index=self.index,
                                  doc_type=self.doc_type,
-                                 body=body,
+                                 body=json_dumps(body),
                                  filter_path=filter_path,
                                  size=size)
         return request
@@ -74,24 +202,27 @@ class Kidash:
         :param body: Body of the query to send
         :returns: an id's list
         """
-        filter_path = ['hits.hits._id']
-        size = self.get_number_of_items(body)
-        request = self.search_request(body, size, filter_path)
-        ids_list = request['hits']['hits']
+        ids_list = [{'_id': item['_id']}
+                    for item in self.scroll_items(body, ['_id'], _source=False)]
         return ids_list
 
-    def retrieve_items_by_list(self, ids_list):
+    def retrieve_items_by_list(self, ids_list, chunk_size=CHUNK_SIZE):
         """Retrieve items based in a given id's list.
 
-        :param body: Body of the query to send
-        :returns: The list of elements retrieved
+        The items are requested in chunks of 'chunk_size' ids, so the
+        size of each response is bounded.
+
+        :param ids_list: List of the ids of the items to retrieve
+        :param chunk_size: Number of ids per request
+        :yields: The elements retrieved
         """
-        body_docs = {'docs': ids_list}
-        request = self.es.mget(index=self.index,
-                               doc_type=self.doc_type,
-                               body=json.dumps(body_docs))
-        elements_list = request['docs']
-        return elements_list
+        for i in range(0, len(ids_list), chunk_size):
+            body_docs = {'docs': ids_list[i:i + chunk_size]}
+            request = self.es.mget(index=self.index,
+                                   doc_type=self.doc_type,
+                                   body=json_dumps(body_docs))
+            for element in request['docs']:
+                yield element
 
     def retrieve_items_by_query(self, body=ALL):
         """Retrieve items based in a given query.
@@ -99,12 +230,10 @@ class Kidash:
         By default it launches the query 'match_all'
 
         :param body: Body of the query to send
-        :returns: The list of elements retrieved
+        :yields: The elements retrieved
         """
-        filter_path = ['hits.hits._*']
-        size = self.get_number_of_items(body)
-        request = self.search_request(body, size, filter_path)
-        return request['hits']['hits']
+        for item in self.scroll_items(body, ['_id', '_type', '_source']):
+            yield item
 
     def stream_items(self, query):
         """Scan the items of a given query, retrieve it and adds the delete operation.
@@ -113,79 +242,381 @@ class Kidash:
         :param query: Body of the query to send
         :yields: The elements retrieved
         """
-        for item in scan(self.es,
-                         query=query,
-                         index=self.index,
-                         doc_type=self.doc_type,
-                         scroll='1m',
-                         _source=False):
-
-            del item['_score']
-            item['_op_type'] = 'delete'
-            yield item
+        for item in self.sliced_scroll_items(query, ['_index', '_type', '_id'],
+                                             scroll=DELETE_SCROLL, _source=False):
+            yield self.delete_action(item)
 
-    def load_items(self, list_of_elements):
-        """Load a list of given items into ElasticSearch.
+    def scroll_items(self, query, fields, scroll=SCROLL, **kwargs):
+        """Scroll over the items of a given query.
 
-        :param doc_type: Type of document to search
-        :param list_of_elements: List of the elements to load
+        Only the given fields of each hit are sent by ElasticSearch,
+        so no bytes are spent on metadata that is not used.
+
+        :param query: Body of the query to send
+        :param fields: List of the fields of the hits to retrieve
+        :param scroll: Time to keep the scroll context alive between pages
+        :param kwargs: Extra parameters for the search request
+        :yields: The elements retrieved
+        :raises ScanError: when the request fails on any of the shards
+        """
+        filter_path = ['_scroll_id', '_shards'] + ['hits.hits.' + field for field in fields]
+        body = json_dumps(dict(query, sort='_doc'))
+
+        response = self.es.search(index=self.index,
+                                  doc_type=self.doc_type,
+                                  body=body,
+                                  scroll=scroll,
+                                  size=CHUNK_SIZE,
+                                  filter_path=filter_path,
+                                  **kwargs)
+        scroll_id = response.get('_scroll_id')
+        try:
+            while True:
+                shards = response.get('_shards', {})
+                succeeded = shards.get('successful', 0) + shards.get('skipped', 0)
+                if shards.get('failed') or succeeded < shards.get('total', 0):
+                    msg = "Scroll request has only succeeded on %s shards out of %s" \
+                          % (shards.get('successful'), shards.get('total'))
+                    logger.error(msg)
+                    raise ScanError(scroll_id, msg)
+
+                hits = response.get('hits', {}).get('hits', [])
+                if not hits:
+                    break
+                for hit in hits:
+                    yield hit
+
+                response = self.es.scroll(scroll_id=scroll_id,
+                                          scroll=scroll,
+                                          filter_path=filter_path)
+                scroll_id = response.get('_scroll_id', scroll_id)
+        finally:
+            if scroll_id:
+                self.es.clear_scroll(scroll_id=scroll_id, ignore=(404,))
+
+    def sliced_scroll_items(self, query, fields, scroll=SCROLL, **kwargs):
+        """Scroll over the items of a given query using a slice per shard.
+
+        Each slice is scrolled in its own thread and the items are
+        yielded as they arrive, in no particular order. Slices beyond
+        the number of shards do not make the scroll faster, so there
+        are as many slices as shards in the index, up to MAX_SLICES.
+        The connection pool keeps room for these threads on top of the
+        Bulk ones.
+
+        :param query: Body of the query to send
+        :param fields: List of the fields of the hits to retrieve
+        :param scroll: Time to keep the scroll contexts alive between pages
+        :param kwargs: Extra parameters for the search request
+        :yields: The elements retrieved
+        """
+        slices = min(self.get_number_of_shards(), MAX_SLICES)
+        if slices < 2:
+            yield from self.scroll_items(query, fields, scroll=scroll, **kwargs)
+            return
+
+        items = queue.Queue(maxsize=CHUNK_SIZE)
+        done = threading.Event()
+
+        def put(item):
+            while not done.is_set():
+                try:
+                    items.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    pass
+
+        def scroll_slice(slice_id):
+            body = dict(query, slice={'id': slice_id, 'max': slices})
+            try:
+                for item in self.scroll_items(body, fields, scroll=scroll, **kwargs):
+                    if done.is_set():
+                        return
+                    put(item)
+                put(None)
+            except Exception as e:
+                put(e)
+
+        threads = [threading.Thread(target=scroll_slice, args=(slice_id,), daemon=True)
+                   for slice_id in range(slices)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            running = slices
+            while running:
+                item = items.get()
+                if item is None:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            done.set()
+            for thread in threads:
+                thread.join()
+
+    def get_number_of_shards(self):
+        """Retrieve the number of primary shards of the index.
+
+        When the index is an alias of several indices, the highest
+        number of shards among them is returned.
+
+        :returns: the number of shards
         """
-        bulk_items = []
-        for element in list_of_elements:
+        response = self.es.indices.get_settings(index=self.index,
+                                                name='index.number_of_shards')
+        shards = [int(data['settings']['index']['number_of_shards'])
+                  for data in response.values()]
+        return max(shards, default=1)
+
+    @staticmethod
+    def delete_action(item):
+        """Build the delete operation for a given item.
+
+        :param item: Item with the metadata of the document to delete
+        :returns: The delete action
+        """
+        action = {
+                    "_op_type": 'delete',
+                    "_index": item['_index'],
+                    "_type": item['_type'],
+                    "_id": item['_id'],
+                 }
+        return action
+
+    def index_actions(self, elements):
+        """Build the index operation for each of the given elements.
+
+        :param elements: Iterable of the elements to index
+        :yields: The index actions
+        """
+        for element in elements:
             item = {
                         "_index": self.index,
                         "_type": element['_type'],
                         "_id": element['_id'],
                         "_source": element['_source'],
                     }
-            bulk_items.append(item)
-        bulk(self.es, bulk_items)
+            yield item
+
+    def load_items(self, list_of_elements):
+        """Load a list of given items into ElasticSearch.
+
+        :param doc_type: Type of document to search
+        :param list_of_elements: List of the elements to load
+        """
+        self.bulk_items(self.index_actions(list_of_elements))
 
     def delete_items(self, query):
         """Remove the elements of a given query by using Bulk operations.
 
+        The elements are deleted in batches of 'batch_size' items per
+        request, so each request finishes within the cluster timeouts.
+        Failed deletions are retried once.
+
+        The scroll is only advanced between batches, so its context is
+        kept alive for DELETE_SCROLL. That is longer than a batch can
+        take in the worst case: the batch and its retry, with every
+        request timing out after BULK_REQUEST_TIMEOUT seconds and
+        retried MAX_RETRIES times.
+
         :param doc_type: Type of document to search
         :param query: Body of the query to send
         """
-        bulk(self.es, self.stream_items(query), chunk_size=CHUNK_SIZE)
-
-    def import_items(self, filepath):
+        actions = self.stream_items(query)
+        batch_length = self.batch_size * self.thread_count
+
+        batch = list(itertools.islice(actions, batch_length))
+        while batch:
+            failed = self.delete_batch(batch)
+            if failed:
+                logger.warning("%s items could not be deleted, retrying", len(failed))
+                failed = self.delete_batch(failed)
+            for action in failed:
+                logger.error("Unable to delete item %s", action['_id'])
+            batch = list(itertools.islice(actions, batch_length))
+
+    def delete_batch(self, batch):
+        """Send a batch of delete actions to ElasticSearch.
+
+        Items which are not found are considered already deleted.
+
+        :param batch: List of the delete actions to send
+        :returns: The list of delete actions that failed
+        """
+        errors = self.bulk_items(batch,
+                                 chunk_size=self.batch_size,
+                                 request_timeout=BULK_REQUEST_TIMEOUT,
+                                 raise_on_error=False)
+        failed = [self.delete_action(info['delete'])
+                  for info in errors if info['delete'].get('status') != 404]
+        return failed
+
+    def bulk_items(self, actions, chunk_size=None, **kwargs):
+        """Send a set of actions to ElasticSearch using parallel Bulk operations.
+
+        The size of each request is bounded by 'chunk_size' documents and
+        'max_chunk_bytes' bytes, whichever is reached first. A sensible
+        value for 'chunk_size' is 'max_chunk_bytes' divided by the average
+        size of the documents.
+
+        :param actions: Iterable of the actions to send
+        :param chunk_size: Number of documents per request; by default,
+            the one given when the object was created
+        :param kwargs: Extra parameters for the Bulk helper
+        :returns: The list of results of the failed actions
+        """
+        errors = []
+        for ok, info in parallel_bulk(self.es, actions,
+                                      thread_count=self.thread_count,
+                                      chunk_size=chunk_size or self.chunk_size,
+                                      max_chunk_bytes=self.max_chunk_bytes,
+                                      queue_size=BULK_QUEUE_SIZE,
+                                      **kwargs):
+            if not ok:
+                logger.debug("Bulk action failed: %s", info)
+                errors.append(info)
+        return errors
+
+    def import_items(self, filepath, file_format='json'):
         """Import a set of elements given a file.
 
         :param filepath: Path of the file to load
+        :param file_format: Format of the file; 'json' by default
         """
-        list_of_elements = json.loads(open(filepath).read())
-        self.load_items(list_of_elements)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+        if file_format == 'json':
+            list_of_elements = json_loads(data)
+        else:
+            list_of_elements = binary_loads(data, file_format)
 
-    def export_items(self, output_file, query):
+        if not self.es.indices.exists(index=self.index):
+            self.load_items(list_of_elements)
+            return
+
+        settings = self.get_index_settings()
+        self.update_index_settings(BULK_INDEX_SETTINGS)
+        try:
+            self.load_items(list_of_elements)
+        finally:
+            for index, index_settings in settings.items():
+                # Another import is running; its own values will be restored
+                if index_settings == BULK_INDEX_SETTINGS:
+                    continue
+                self.update_index_settings(index_settings, index=index)
+            self.es.indices.refresh(index=self.index)
+
+    def get_index_settings(self):
+        """Retrieve the refresh interval and number of replicas of the index.
+
+        When the index is an alias, the settings of each of the indices
+        behind it are returned. Settings not explicitly set on an index
+        are returned as None, so they are reset to the ElasticSearch
+        defaults when restored.
+
+        :returns: a dict with the current settings per index name
+        """
+        response = self.es.indices.get_settings(index=self.index)
+        settings = {}
+        for index, data in response.items():
+            index_settings = data['settings']['index']
+            settings[index] = {
+                "refresh_interval": index_settings.get('refresh_interval'),
+                "number_of_replicas": index_settings.get('number_of_replicas')
+            }
+        return settings
+
+    def update_index_settings(self, settings, index=None):
+        """Update the settings of the index.
+
+        :param settings: dict with the settings to update
+        :param index: name of the index to update; by default, the one
+            given when the object was created
+        """
+        self.es.indices.put_settings(index=index or self.index,
+                                     body={"index": settings})
+
+    def export_items(self, output_file, query, file_format='json', pretty=False):
         """Export a set of elements based on the parameters given.
 
-        :param output_file: File where to export the items
+        JSON items are written one by one as they are retrieved, so the
+        whole set is never held in memory. Binary formats are written
+        in a single document.
+
+        :param output_file: Binary file where to export the items
+        :param query: Body of the query to send
+        :param file_format: Format of the output; 'json' by default
+        :param pretty: Indent JSON output and sort its keys
         """
         items = self.retrieve_items_by_query(query)
         try:
-            output_file.write(json.dumps(items, indent=2, sort_keys=True))
-            output_file.write('\n')
+            if file_format == 'json':
+                self.write_json_items(output_file, items, pretty)
+            else:
+                output_file.write(binary_dumps(list(items), file_format))
         except IOError as e:
             raise RuntimeError(str(e))
 
+    @staticmethod
+    def write_json_items(output_file, items, pretty=False):
+        """Write a set of items to a file as a JSON array.
+
+        :param output_file: Binary file where to write the items
+        :param items: Iterable of the items to write
+        :param pretty: Indent the output and sort the keys
+        """
+        if pretty:
+            start, separator, end = b'[\n', b',\n', b'\n]\n'
+        else:
+            start, separator, end = b'[', b',', b']\n'
+
+        prefix = start
+        for item in items:
+            output_file.write(prefix)
+            if pretty:
+                output_file.write(INDENT + json_dumps(item, pretty).replace(b'\n', b'\n' + INDENT))
+            else:
+                output_file.write(json_dumps(item))
+            prefix = separator
+
+        if prefix == start:
+            output_file.write(b'[]\n')
+        else:
+            output_file.write(end)
+
 
 class KidashCommand:
     """Abstract class to run actions from the command line.
 
     When the class is initialized, it parses the given arguments using
     the defined argument parser on the class method. Those arguments
-    will be stored in the attribute 'parsed_args'.
+    will be stored in the attribute 'parsed_args'. The parser is built
+    once per class and reused by the following instances. Arguments
+    already parsed can be given with 'parsed_args' to skip the parsing.
 
     The method 'run' must be implemented to exectute the action.
     """
-    def __init__(self, *args):
-        parser = self.create_argument_parser()
-        self.parsed_args = parser.parse_args(args)
+    def __init__(self, *args, parsed_args=None):
+        if parsed_args is None:
+            parser = self.get_argument_parser()
+            parsed_args = parser.parse_args(args)
+        self.parsed_args = parsed_args
 
     def run(self):
         raise NotImplementedError
 
+    @classmethod
+    def get_argument_parser(cls):
+        """Returns the argument parser of the class, building it only once."""
+
+        if '_parser' not in cls.__dict__:
+            cls._parser = cls.create_argument_parser()
+        return cls._parser
+
     @classmethod
     def create_argument_parser(cls):
         """Returns a generic argument parser."""
@@ -203,8 +634,8 @@ class KidashCommand:
 class ImportCommand(KidashCommand):
     """Class to run Import action from the command line."""
 
-    def __init__(self, *args):
-        super().__init__(*args)
+    def __init__(self, *args, parsed_args=None):
+        super().__init__(*args, parsed_args=parsed_args)
 
         self.url = self.parsed_args.url
         self.filepath = self.parsed_args.filepath
@@ -216,7 +647,7 @@ class ImportCommand(KidashCommand):
         This method runs the action to load the elements available in the JSON
         file into the Kibana dashboard.
         """
-        self.action.import_items(self.filepath)
+        self.action.import_items(self.filepath, self.parsed_args.format)
 
     @classmethod
     def create_argument_parser(cls):
@@ -225,7 +656,14 @@ class ImportCommand(KidashCommand):
         parser = super().create_argument_parser()
 
         parser.add_argument('filepath',
-                            help="JSON file in Kibana format to be loaded.")
+                            help="File in Kibana format to be loaded.")
+
+        group = parser.add_argument_group('general arguments')
+
+        group.add_argument('--format', dest='format', default='json',
+                           choices=list(FORMATS),
+                           help="Format of the file. Available ones are: "
+                           "'json', 'cbor', 'msgpack' and 'ubjson'")
 
         return parser
 
@@ -233,8 +671,8 @@ class ImportCommand(KidashCommand):
 class ExportCommand(KidashCommand):
     """Class to run Export action from the command line."""
 
-    def __init__(self, *args):
-        super().__init__(*args)
+    def __init__(self, *args, parsed_args=None):
+        super().__init__(*args, parsed_args=parsed_args)
 
         self.url = self.parsed_args.url
         self.outputfile = self.parsed_args.outputfile
@@ -250,12 +688,10 @@ class ExportCommand(KidashCommand):
         This method runs the action to load the elements available in the JSON
         file into the Kibana dashboard.
         """
-        if self.parsed_args.filter is 'filter':
-            self.action.export_items(self.outputfile, FILTER)
-        elif self.parsed_args.filter is 'client':
-            self.action.export_items(self.outputfile, CLIENT_FILTER)
-        else:
-            self.action.export_items(self.outputfile, ALL)
+        self.action.export_items(self.outputfile,
+                                 QUERIES[self.parsed_args.filter],
+                                 file_format=self.parsed_args.format,
+                                 pretty=self.parsed_args.pretty)
 
     @classmethod
     def create_argument_parser(cls):
@@ -263,8 +699,8 @@ class ExportCommand(KidashCommand):
 
         parser = super().create_argument_parser()
 
-        parser.add_argument('outputfile', nargs='?', type=argparse.FileType('w'),
-                            help="JSON file where to export Kibana elements.")
+        parser.add_argument('outputfile', nargs='?', type=argparse.FileType('wb'),
+                            help="File where to export Kibana elements.")
 
         group = parser.add_argument_group('general arguments')
 
@@ -272,16 +708,23 @@ class ExportCommand(KidashCommand):
                            help="Document type. Available ones from Kibana are: "
                            "'dashboard', 'visualization', 'search' and 'index-pattern'")
         group.add_argument('-f', '--filter', dest='filter',
+                           choices=['client', 'filter', 'all'],
                            help="Select a filter to export. Available ones are: "
-                           "'client', 'filtered' and 'all'")
+                           "'client', 'filter' and 'all'")
+        group.add_argument('--format', dest='format', default='json',
+                           choices=list(FORMATS),
+                           help="Format of the output file. Available ones are: "
+                           "'json', 'cbor', 'msgpack' and 'ubjson'")
+        group.add_argument('--pretty', dest='pretty', action='store_true',
+                           help="Indent JSON output and sort its keys")
         return parser
 
 
 class DeleteCommand(KidashCommand):
         """Class to run Delete action from the command line."""
 
-        def __init__(self, *args):
-            super().__init__(*args)
+        def __init__(self, *args, parsed_args=None):
+            super().__init__(*args, parsed_args=parsed_args)
 
             self.url = self.parsed_args.url
             if self.parsed_args.doc_type:
@@ -296,12 +739,7 @@ class DeleteCommand(KidashCommand):
             This method runs the action to load the elements available in the JSON
             file into the Kibana dashboard.
             """
-            if self.parsed_args.filter is 'filter':
-                self.action.delete_items(FILTER)
-            elif self.parsed_args.filter is 'client':
-                self.action.delete_items(CLIENT_FILTER)
-            else:
-                self.action.delete_items(ALL)
+            self.action.delete_items(QUERIES[self.parsed_args.filter])
 
         @classmethod
         def create_argument_parser(cls):
@@ -315,7 +753,8 @@ class DeleteCommand(KidashCommand):
                                help="Document type. Available ones from Kibana are: "
                                "'dashboard', 'visualization', 'search' and 'index-pattern'")
             group.add_argument('-f', '--filter', dest='filter',
+                               choices=['client', 'filter', 'all'],
                                help="Select a filter to delete. Available ones are: "
-                               "'client', 'filtered' and 'all'")
+                               "'client', 'filter' and 'all'")
 
             return parser
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+# Authors:
+#     Alberto Martín <alberto.martin@bitergia.com>
+#
+
+import io
+import json
+import os
+import sys
+import threading
+import unittest
+import unittest.mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from kidash.kidash import Kidash, ALL, BULK_REQUEST_TIMEOUT
+
+
+class FakeIndices:
+    """Fake indices client of ElasticSearch"""
+
+    def __init__(self, shards):
+        self.shards = shards
+
+    def get_settings(self, index, name=None):
+        return {index: {'settings': {'index': {'number_of_shards': str(self.shards)}}}}
+
+
+class FakeElasticsearch:
+    """Fake ElasticSearch client which returns two pages of hits per slice.
+
+    When 'failing_slice' is set, the search request of that slice fails.
+    """
+
+    def __init__(self, shards=1, hits_per_page=2, failing_slice=None):
+        self.indices = FakeIndices(shards)
+        self.hits_per_page = hits_per_page
+        self.failing_slice = failing_slice
+        self.pages = {}
+        self.cleared = []
+        self.lock = threading.Lock()
+
+    def search(self, body, **kwargs):
+        query = json.loads(body.decode('utf-8'))
+        slice_id = query.get('slice', {}).get('id', 0)
+
+        if slice_id == self.failing_slice:
+            raise RuntimeError("slice %s failed" % slice_id)
+
+        scroll_id = str(slice_id)
+        with self.lock:
+            self.pages[scroll_id] = 0
+        return self.response(scroll_id)
+
+    def scroll(self, scroll_id, **kwargs):
+        with self.lock:
+            self.pages[scroll_id] += 1
+        return self.response(scroll_id)
+
+    def clear_scroll(self, scroll_id, **kwargs):
+        with self.lock:
+            self.cleared.append(scroll_id)
+
+    def response(self, scroll_id):
+        response = {
+            '_scroll_id': scroll_id,
+            '_shards': {'total': 1, 'successful': 1, 'skipped': 0, 'failed': 0}
+        }
+        page = self.pages[scroll_id]
+        if page < 2:
+            hits = [{'_index': 'kibana', '_type': 'doc', '_id': '%s-%s-%s' % (scroll_id, page, i)}
+                    for i in range(self.hits_per_page)]
+            response['hits'] = {'hits': hits}
+        return response
+
+
+def make_kidash(es):
+    kidash = Kidash('http://localhost:9200', thread_count=2)
+    kidash.es = es
+    return kidash
+
+
+class TestSlicedScrollItems(unittest.TestCase):
+    """Tests for the sliced scroll of items"""
+
+    def setUp(self):
+        self.threads = threading.active_count()
+
+    def test_merge_slices(self):
+        """Test if the items of every slice are returned"""
+
+        es = FakeElasticsearch(shards=3)
+        kidash = make_kidash(es)
+
+        items = list(kidash.sliced_scroll_items(ALL, ['_id']))
+
+        ids = sorted(item['_id'] for item in items)
+        expected = sorted('%s-%s-%s' % (s, p, i)
+                          for s in range(3) for p in range(2) for i in range(2))
+        self.assertListEqual(ids, expected)
+        self.assertListEqual(sorted(es.cleared), ['0', '1', '2'])
+        self.assertEqual(threading.active_count(), self.threads)
+
+    def test_single_shard(self):
+        """Test if a plain scroll is used when the index has one shard"""
+
+        es = FakeElasticsearch(shards=1)
+        kidash = make_kidash(es)
+
+        items = list(kidash.sliced_scroll_items(ALL, ['_id']))
+
+        self.assertEqual(len(items), 4)
+        self.assertListEqual(es.cleared, ['0'])
+
+    def test_slice_error(self):
+        """Test if an error in a slice is raised to the caller"""
+
+        es = FakeElasticsearch(shards=3, failing_slice=1)
+        kidash = make_kidash(es)
+
+        with self.assertRaisesRegex(RuntimeError, "slice 1 failed"):
+            list(kidash.sliced_scroll_items(ALL, ['_id']))
+
+        self.assertEqual(threading.active_count(), self.threads)
+
+    def test_close(self):
+        """Test if closing the generator early stops the slice threads"""
+
+        es = FakeElasticsearch(shards=3, hits_per_page=5000)
+        kidash = make_kidash(es)
+
+        items = kidash.sliced_scroll_items(ALL, ['_id'])
+        next(items)
+        items.close()
+
+        self.assertEqual(threading.active_count(), self.threads)
+
+
+class FakeParallelBulk:
+    """Stub of parallel_bulk which fails on the given ids.
+
+    'status' maps ids to the status of their delete actions on each
+    call; the ones not listed succeed.
+    """
+
+    def __init__(self, status):
+        self.status = status
+        self.calls = []
+
+    def __call__(self, client, actions, **kwargs):
+        actions = list(actions)
+        self.calls.append((actions, kwargs))
+        call = len(self.calls) - 1
+
+        for action in actions:
+            status = self.status.get(action['_id'], [200] * (call + 1))[call]
+            info = {
+                'delete': {
+                    '_index': action['_index'],
+                    '_type': action['_type'],
+                    '_id': action['_id'],
+                    'status': status
+                }
+            }
+            yield 200 <= status < 300, info
+
+
+def delete_actions(ids):
+    return [Kidash.delete_action({'_index': 'kibana', '_type': 'doc', '_id': item_id})
+            for item_id in ids]
+
+
+class TestDeleteItems(unittest.TestCase):
+    """Tests for the deletion of items"""
+
+    def delete(self, ids, status):
+        kidash = make_kidash(FakeElasticsearch())
+        bulk = FakeParallelBulk(status)
+
+        with unittest.mock.patch('kidash.kidash.parallel_bulk', bulk), \
+                unittest.mock.patch.object(kidash, 'stream_items',
+                                           return_value=iter(delete_actions(ids))):
+            kidash.delete_items(ALL)
+
+        return bulk.calls
+
+    def test_delete(self):
+        """Test if items are deleted in batches of 'batch_size' per thread"""
+
+        ids = [str(i) for i in range(2500)]
+        calls = self.delete(ids, {})
+
+        self.assertEqual(len(calls), 3)
+        self.assertListEqual([len(actions) for actions, _ in calls], [1000, 1000, 500])
+        self.assertListEqual([action['_id'] for actions, _ in calls for action in actions], ids)
+
+        kwargs = calls[0][1]
+        self.assertEqual(kwargs['chunk_size'], 500)
+        self.assertEqual(kwargs['request_timeout'], BULK_REQUEST_TIMEOUT)
+        self.assertFalse(kwargs['raise_on_error'])
+
+    def test_retry_failed(self):
+        """Test if failed deletions are retried once"""
+
+        calls = self.delete(['1', '2', '3'], {'2': [503, 200]})
+
+        self.assertEqual(len(calls), 2)
+        retried = calls[1][0]
+        self.assertListEqual(retried, delete_actions(['2']))
+
+    def test_not_found(self):
+        """Test if items not found are not retried"""
+
+        calls = self.delete(['1', '2', '3'], {'2': [404]})
+
+        self.assertEqual(len(calls), 1)
+
+    def test_retry_failed_twice(self):
+        """Test if items failing after the retry are logged"""
+
+        with self.assertLogs('kidash.kidash', level='ERROR') as cm:
+            calls = self.delete(['1', '2'], {'1': [503, 503]})
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cm.output, ['ERROR:kidash.kidash:Unable to delete item 1'])
+
+
+class TestWriteJSONItems(unittest.TestCase):
+    """Tests for the JSON writer of exported items"""
+
+    items = [
+        {'_id': 'b', '_type': 'doc', '_source': {'title': 'B', 'panels': [1, 2]}},
+        {'_id': 'a', '_type': 'doc', '_source': {}}
+    ]
+
+    def test_compact(self):
+        """Test if items are written as a compact JSON array"""
+
+        output = io.BytesIO()
+        Kidash.write_json_items(output, iter(self.items))
+
+        expected = b'[{"_id":"b","_type":"doc","_source":{"title":"B","panels":[1,2]}},' \
+                   b'{"_id":"a","_type":"doc","_source":{}}]\n'
+        self.assertEqual(output.getvalue(), expected)
+
+    def test_pretty(self):
+        """Test if pretty output matches an indented array with sorted keys"""
+
+        output = io.BytesIO()
+        Kidash.write_json_items(output, iter(self.items), pretty=True)
+
+        expected = json.dumps(self.items, indent=2, sort_keys=True) + '\n'
+        self.assertEqual(output.getvalue().decode('utf-8'), expected)
+
+    def test_single_item(self):
+        """Test if a single item is written without separators"""
+
+        for pretty in (False, True):
+            output = io.BytesIO()
+            Kidash.write_json_items(output, iter(self.items[:1]), pretty=pretty)
+            self.assertListEqual(json.loads(output.getvalue().decode('utf-8')), self.items[:1])
+
+    def test_empty(self):
+        """Test if an empty array is written when there are no items"""
+
+        for pretty in (False, True):
+            output = io.BytesIO()
+            Kidash.write_json_items(output, iter([]), pretty=pretty)
+            self.assertEqual(output.getvalue(), b'[]\n')
+
+
+if __name__ == "__main__":
+    unittest.main(warnings='ignore')